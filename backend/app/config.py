@@ -35,6 +35,8 @@ class Settings(BaseSettings):
     qdrant_path: str = "./data/qdrant"  # Local mode path
     qdrant_url: Optional[str] = None  # Server mode URL (overrides path if set)
     qdrant_api_key: Optional[str] = None  # For Qdrant Cloud or secured instances
+    qdrant_prefer_grpc: bool = True  # Server mode: talk gRPC instead of REST/JSON
+    qdrant_grpc_port: int = 6334
 
     # File Storage
     upload_path: str = "./data/uploads"
@@ -43,7 +45,6 @@ class Settings(BaseSettings):
     # AI/Chat Settings
     message_limit_default: int = 1000
     max_scrape_words: int = 10000
-    embedding_model: str = "text-embedding-3-small"
     ai_provider: str = "openai"  # openai, local
     ollama_base_url: str = "http://host.docker.internal:11434"
     embedding_model: str = "text-embedding-3-small"
@@ -61,19 +62,16 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = "INFO"
 
-    # Optional API Keys (for future features)
-    google_api_key: Optional[str] = None
-    anthropic_api_key: Optional[str] = None
-    clerk_secret_key: Optional[str] = None
-    clerk_webhook_secret: Optional[str] = None
-    stripe_secret_key: Optional[str] = None
-    stripe_publishable_key: Optional[str] = None
+    # Optional API keys for future features (Google, Anthropic, Clerk, Stripe)
+    # are not declared until something reads them; extra="ignore" means
+    # setting them in the environment is harmless.
 
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
         case_sensitive=False,
-        extra="ignore"
+        extra="ignore",
+        env_ignore_empty=True,  # Treat VAR= as unset (e.g. empty compose substitutions)
     )
 
     @property
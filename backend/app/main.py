@@ -2,17 +2,21 @@
 FastAPI application entry point.
 
 This module initializes the FastAPI app, sets up CORS middleware,
-and mounts all API routes.
+and mounts all API routes (at startup, see register_routes).
 """
 
+import asyncio
 import logging
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
+from starlette.exceptions import HTTPException as StarletteHTTPException
 import os
 
 from app.config import get_settings
@@ -31,17 +35,22 @@ async def lifespan(app: FastAPI):
     Lifespan context manager for startup and shutdown events.
 
     Handles:
+    - Registering API routes
     - Creating data directories
     - Database initialization (Phase 1.2)
     - Creating admin user (Phase 1.3)
+    - Warming the local embedding model (when AI_PROVIDER is local)
     """
     from app.database import init_db, close_db
 
     settings = get_settings()
     logger.info(f"Starting {settings.app_name} v{settings.app_version}")
 
-    # Create necessary directories
-    settings.ensure_data_directories()
+    # Mount API routes (deferred from import time)
+    register_routes(app)
+
+    # Create necessary directories (blocking mkdir calls, keep them off the loop)
+    await asyncio.to_thread(settings.ensure_data_directories)
     logger.info("Data directories initialized")
 
     # Initialize database (create tables)
@@ -76,6 +85,15 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize Qdrant collection: {e}")
         raise
 
+    # Pre-load the local embedding model in the background so the first
+    # ingestion/chat doesn't pay the load cost (may download on first run)
+    from app.services.config_service import get_ai_config
+
+    if (await get_ai_config()).get("ai_provider") == "local":
+        from app.services.embeddings import warm_fastembed_model
+
+        app.state.embedding_warmup = asyncio.create_task(warm_fastembed_model())
+
     yield
 
     # Cleanup on shutdown
@@ -88,6 +106,16 @@ async def lifespan(app: FastAPI):
 
     await close_client()
 
+    # Close shared HTTP client
+    from app.services.http_client import close_http_client
+
+    await close_http_client()
+
+    # Stop the FastEmbed worker process (if local embeddings were used)
+    from app.services.embeddings import close_embed_pool
+
+    close_embed_pool()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -152,6 +180,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON payloads (admin config, model lists, OpenAPI schema).
+# The chat SSE stream opts out via Content-Encoding: identity.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+
+# Health-check timestamp, formatted at most once per second
+_health_ts: tuple[int, str] = (0, "")
+
+
+def _iso_timestamp() -> str:
+    """Current UTC time as ISO 8601 (second resolution), cached per second."""
+    global _health_ts
+
+    now = int(time.time())
+    if now != _health_ts[0]:
+        _health_ts = (now, datetime.utcfromtimestamp(now).isoformat())
+    return _health_ts[1]
+
 
 # Health check endpoint
 @app.get("/api/health", tags=["Health"])
@@ -170,18 +216,16 @@ async def health_check():
     # Overall health is healthy only if all components are healthy
     overall_healthy = qdrant_status.get("healthy", False)
 
-    return JSONResponse(
-        content={
-            "status": "healthy" if overall_healthy else "unhealthy",
-            "service": "myndulon-api",
-            "version": "0.1.0",
-            "timestamp": datetime.utcnow().isoformat(),
-            "components": {
-                "database": "healthy",  # SQLite is always available if app started
-                "qdrant": qdrant_status,
-            },
-        }
-    )
+    return {
+        "status": "healthy" if overall_healthy else "unhealthy",
+        "service": "myndulon-api",
+        "version": "0.1.0",
+        "timestamp": _iso_timestamp(),
+        "components": {
+            "database": "healthy",  # SQLite is always available if app started
+            "qdrant": qdrant_status,
+        },
+    }
 
 
 # Root endpoint moved to /api
@@ -207,6 +251,74 @@ if not os.path.exists(FRONTEND_DIST) and os.path.exists(os.path.join(BASE_DIR, "
     FRONTEND_DIST = os.path.join(BASE_DIR, "../frontend/dist")
     WIDGET_DIST = os.path.join(BASE_DIR, "../frontend/widget/dist")
 
+# index.html is immutable for the life of the process: read it once and
+# serve the SPA fallback from memory
+try:
+    with open(os.path.join(FRONTEND_DIST, "index.html"), "rb") as f:
+        INDEX_HTML: bytes | None = f.read()
+except FileNotFoundError:
+    INDEX_HTML = None
+
+
+# Paths that must never fall back to the SPA shell
+_NON_SPA_PREFIXES = ("api", "docs", "redoc", "openapi.json")
+
+
+class SPAStaticFiles(StaticFiles):
+    """
+    StaticFiles mount for the dashboard SPA.
+
+    Serves files from the frontend dist and falls back to index.html for
+    client-side routes. Unmatched API/docs paths get a JSON 404 instead,
+    and methods other than GET/HEAD get a 405, as with the API routes.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await super().__call__(scope, receive, send)
+            return
+
+        if scope["method"] not in ("GET", "HEAD"):
+            response = JSONResponse(
+                {"detail": "Method Not Allowed"},
+                status_code=405,
+                headers={"Allow": "GET, HEAD"},
+            )
+        elif self.get_path(scope).startswith(_NON_SPA_PREFIXES):
+            response = JSONResponse({"error": "Not found"}, status_code=404)
+        elif not self.config_checked and not os.path.isdir(self.directory):
+            # No frontend build (backend-only run): StaticFiles' own
+            # directory check would raise, so answer without it
+            response = _spa_fallback()
+        else:
+            await super().__call__(scope, receive, send)
+            return
+
+        await response(scope, receive, send)
+
+    async def get_response(self, path: str, scope):
+        try:
+            response = await super().get_response(path, scope)
+            if response.status_code != 404:
+                return response
+        except StarletteHTTPException as e:
+            if e.status_code != 404:
+                raise
+
+        return _spa_fallback()
+
+
+def _spa_fallback() -> Response:
+    """index.html for client-side routes, or a 404 if the frontend isn't built."""
+    if INDEX_HTML is not None:
+        return Response(content=INDEX_HTML, media_type="text/html")
+
+    return JSONResponse(
+        {"error": f"Frontend not built at {FRONTEND_DIST}. Please run 'npm run build' in frontend directory."},
+        status_code=404
+    )
+
+
 # Mount widget assets (if built)
 if os.path.exists(WIDGET_DIST):
     app.mount("/widget", StaticFiles(directory=WIDGET_DIST), name="widget")
@@ -217,58 +329,66 @@ if os.path.exists(assets_path):
     app.mount("/assets", StaticFiles(directory=assets_path), name="assets")
 
 
+def register_routes(app: FastAPI) -> None:
+    """
+    Import and mount the API routers, then the SPA.
 
-
-# Phase 1.3: Mount auth routes
-from app.routes import auth
-app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
-
-# Phase 2.1: Mount admin routes
-from app.routes import admin, settings
-app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
-app.include_router(settings.router, prefix="/api/admin", tags=["Settings"])
-from app.routes import models
-app.include_router(models.router, prefix="/api/admin/models", tags=["Models"])
-
-# Phase 2.2: Mount public routes
-from app.routes import public
-app.include_router(public.router, prefix="/api/public", tags=["Public"])
-
-# Phase 5: Mount chat routes
-from app.routes import chat
-app.include_router(chat.router, prefix="/api", tags=["Chat"])
-
-
-# SPA Catch-all (must be last)
-@app.get("/{full_path:path}")
-async def serve_spa(full_path: str):
-    # Skip API routes
-    if full_path.startswith("api") or full_path.startswith("docs") or full_path.startswith("redoc") or full_path.startswith("openapi.json"):
-        return JSONResponse({"error": "Not found"}, status_code=404)
-    
-    # Check if file exists in dist (e.g. favicon.ico, manifest.json)
-    potential_path = os.path.join(FRONTEND_DIST, full_path)
-    if os.path.exists(potential_path) and os.path.isfile(potential_path):
-        return FileResponse(potential_path)
-        
-    # Fallback to index.html
-    index_path = os.path.join(FRONTEND_DIST, "index.html")
-    if os.path.exists(index_path):
-        return FileResponse(index_path)
-    
-    return JSONResponse(
-        {"error": f"Frontend not built at {FRONTEND_DIST}. Please run 'npm run build' in frontend directory."}, 
-        status_code=404
-    )
+    Called from lifespan rather than at import time, so importing app.main
+    doesn't pull in every route module and its dependencies. Safe to call
+    more than once (e.g. repeated lifespans in tests).
+    """
+    if getattr(app.state, "routes_registered", False):
+        return
+
+    # Phase 1.3: Mount auth routes
+    from app.routes import auth
+    app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
+
+    # Phase 2.1: Mount admin routes
+    # Imported under an alias so it doesn't shadow the `settings` config object
+    from app.routes import admin, settings as settings_routes
+    app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
+    app.include_router(settings_routes.router, prefix="/api/admin", tags=["Settings"])
+    from app.routes import models
+    app.include_router(models.router, prefix="/api/admin/models", tags=["Models"])
+
+    # Phase 2.2: Mount public routes
+    from app.routes import public
+    app.include_router(public.router, prefix="/api/public", tags=["Public"])
+
+    # Phase 5: Mount chat routes
+    from app.routes import chat
+    app.include_router(chat.router, prefix="/api", tags=["Chat"])
+
+    # Guard against a route being registered twice (duplicate path + method).
+    # Checked per router: newer FastAPI versions keep included routers as
+    # lazy entries in app.routes rather than flattening them.
+    for router in (auth.router, admin.router, settings_routes.router, models.router, public.router, chat.router):
+        route_keys = [
+            (route.path, frozenset(getattr(route, "methods", None) or ()))
+            for route in router.routes
+        ]
+        assert len(set(route_keys)) == len(route_keys), f"Duplicate route registered in {router}"
+
+    # SPA (must be mounted last so API routes take precedence)
+    app.mount("/", SPAStaticFiles(directory=FRONTEND_DIST, html=True, check_dir=False), name="spa")
+
+    # Routes changed: rebuild the OpenAPI schema on next request
+    app.openapi_schema = None
+    app.state.routes_registered = True
 
 
 if __name__ == "__main__":
     import uvicorn
 
+    # Development entrypoint. Production runs through start.sh (multi-worker,
+    # no reloader). uvloop/httptools ship with uvicorn[standard].
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8080,
-        reload=True,
+        reload=settings.debug,
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
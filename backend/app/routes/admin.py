@@ -170,6 +170,11 @@ async def update_bot(
     await db.commit()
     await db.refresh(bot)
 
+    # Drop the cached provider/model/endpoint resolved for this bot
+    from app.services.chat_service import invalidate_bot_config
+
+    invalidate_bot_config(bot.id)
+
     logger.info(f"Admin {admin.username} updated bot: {bot.id} ({bot.name})")
 
     return bot
@@ -214,6 +219,11 @@ async def delete_bot(
     await db.delete(bot)
     await db.commit()
 
+    from app.services.chat_service import invalidate_bot_config, invalidate_context_cache
+
+    invalidate_bot_config(bot_id)
+    invalidate_context_cache(bot_id)
+
     # Delete Qdrant vectors for this bot_id (Phase 4)
     try:
         from app.services.qdrant_client import delete_vectors
@@ -491,6 +501,7 @@ async def ingest_content(
 
     try:
         # Import services
+        from app.services.chat_service import invalidate_context_cache
         from app.services.chunker import chunk_text
         from app.services.embeddings import embed_and_store
         from app.services.qdrant_client import delete_vectors
@@ -543,11 +554,15 @@ async def ingest_content(
         # Delete old vectors first
         logger.info("Clearing old vectors...")
         await delete_vectors(bot_id)
+        invalidate_context_cache(bot_id)
 
         # Generate embeddings and store
         logger.info("Generating embeddings and storing in Qdrant...")
         vector_count = await embed_and_store(bot_id, chunks, bot=bot)
 
+        # Drop answers cached while the new vectors were being written
+        invalidate_context_cache(bot_id)
+
         # Update bot timestamp
         bot.updated_at = bot.updated_at  # Trigger SQLAlchemy update
         await db.commit()
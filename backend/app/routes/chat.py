@@ -16,7 +16,6 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models import Bot, Conversation, Message, generate_uuid
 from app.schemas import ChatRequest
-from app.services.chat_service import generate_response
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -26,6 +25,9 @@ RATE_LIMIT_WINDOW = 60  # seconds
 MAX_MESSAGES_PER_WINDOW = 10  # messages per session per window
 _rate_limit_cache: dict[str, list[datetime]] = {}
 
+# Pre-encoded SSE completion frame
+SSE_DONE = b"data: [DONE]\n\n"
+
 
 def check_rate_limit(session_id: str) -> tuple[bool, Optional[str]]:
     """
@@ -186,20 +188,25 @@ async def stream_response(
         db: Database session
 
     Yields:
-        SSE-formatted response chunks
+        SSE-formatted response chunks (UTF-8 bytes)
     """
-    # Accumulate response for saving
-    full_response = ""
+    # Imported lazily so the RAG stack (OpenAI SDK, Qdrant client) loads on first chat
+    from app.services.chat_service import generate_response
+
+    # Accumulate response tokens for saving (joined once at the end)
+    tokens: list[str] = []
 
     try:
         # Generate streaming response
         async for token in generate_response(bot, user_message, conversation_history):
-            full_response += token
-            # Format as SSE event
-            yield f"data: {token}\n\n"
+            tokens.append(token)
+            # Format as SSE event, encoded once here rather than by StreamingResponse
+            yield b"data: " + token.encode("utf-8") + b"\n\n"
 
         # Send completion signal
-        yield "data: [DONE]\n\n"
+        yield SSE_DONE
+
+        full_response = "".join(tokens)
 
         # Save messages to database
         await save_messages(db, conversation.id, user_message, full_response)
@@ -215,8 +222,8 @@ async def stream_response(
 
     except Exception as e:
         logger.error(f"Error during streaming: {e}")
-        yield f"data: Error: {str(e)}\n\n"
-        yield "data: [DONE]\n\n"
+        yield f"data: Error: {str(e)}\n\n".encode("utf-8")
+        yield SSE_DONE
 
 
 @router.post("/chat")
@@ -280,8 +287,12 @@ async def chat(
     # Get or create conversation
     conversation = await get_or_create_conversation(db, bot.id, request.session_id)
 
-    # Get conversation history
-    conversation_history = await get_conversation_history(db, conversation.id)
+    # Get conversation history (only the window the prompt will use)
+    from app.services.chat_service import MAX_CONVERSATION_HISTORY
+
+    conversation_history = await get_conversation_history(
+        db, conversation.id, limit=MAX_CONVERSATION_HISTORY
+    )
 
     # Stream response
     return StreamingResponse(
@@ -291,5 +302,6 @@ async def chat(
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "X-Accel-Buffering": "no",  # Disable nginx buffering
+            "Content-Encoding": "identity",  # Never gzip: it would buffer tokens
         },
     )
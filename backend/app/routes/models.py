@@ -2,19 +2,32 @@
 API routes for model management (Ollama).
 """
 
+import logging
+import time
+
 import httpx
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+import orjson
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 
 from app.config import get_settings
 from app.dependencies import get_current_admin
 from app.models import AdminSession
+from app.services.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 settings = get_settings()
 
+# Ollama model list cache: base_url -> (fetched_at, models)
+_CACHE_TTL = 30.0  # seconds
+_models_cache: dict[str, tuple[float, List["ModelInfo"]]] = {}
+
 class ModelInfo(BaseModel):
+    model_config = ConfigDict(extra="ignore", validate_assignment=False)
+
     name: str
     size: Optional[int] = 0
     digest: Optional[str] = None
@@ -24,89 +37,96 @@ class PullModelRequest(BaseModel):
     name: str
 
 class PullModelResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore", validate_assignment=False)
+
     status: str
     message: str
 
 @router.get("", response_model=List[ModelInfo])
 async def list_models(
-    current_admin: AdminSession = Depends(get_current_admin)
+    current_admin: AdminSession = Depends(get_current_admin),
+    client: httpx.AsyncClient = Depends(get_http_client),
 ):
     """
     List available models from the local Ollama instance.
+
+    Successful responses are cached per base URL for _CACHE_TTL seconds.
     """
     base_url = settings.ollama_base_url or "http://localhost:11434"
     url = f"{base_url.rstrip('/')}/api/tags"
 
+    cached = _models_cache.get(base_url)
+    if cached and time.monotonic() - cached[0] < _CACHE_TTL:
+        return cached[1]
+
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url)
-            if response.status_code == 200:
-                data = response.json()
-                models = []
-                for m in data.get("models", []):
-                    models.append(ModelInfo(
-                        name=m.get("name"),
-                        size=m.get("size"),
-                        digest=m.get("digest"),
-                        details=m.get("details")
-                    ))
-                return models
-            else:
-                # If Ollama is not reachable or returns error, return empty list or mock
-                return []
+        response = await client.get(url, timeout=10.0)
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            models = []
+            for m in data.get("models", []):
+                # Trusted upstream data: skip per-field validation
+                models.append(ModelInfo.model_construct(
+                    name=m.get("name"),
+                    size=m.get("size"),
+                    digest=m.get("digest"),
+                    details=m.get("details")
+                ))
+            _models_cache[base_url] = (time.monotonic(), models)
+            return models
+        else:
+            # If Ollama is not reachable or returns error, return empty list or mock
+            return []
     except Exception as e:
         # Default mock models if Ollama is offline (for demo purposes)
         return [
-            ModelInfo(name="llama2:latest", size=3826793677),
-            ModelInfo(name="mistral:latest", size=4109865189),
-            ModelInfo(name="qwen:0.5b", size=394305600)
+            ModelInfo.model_construct(name="llama2:latest", size=3826793677),
+            ModelInfo.model_construct(name="mistral:latest", size=4109865189),
+            ModelInfo.model_construct(name="qwen:0.5b", size=394305600)
         ]
 
+async def _do_pull(client: httpx.AsyncClient, url: str, name: str) -> None:
+    """Run an Ollama model pull to completion, draining its progress stream."""
+    try:
+        async with client.stream("POST", url, json={"name": name}, timeout=None) as response:
+            if response.status_code != 200:
+                logger.warning(f"Model pull for {name} failed: HTTP {response.status_code}")
+                return
+            async for _ in response.aiter_bytes():
+                pass
+        logger.info(f"Model pull for {name} completed")
+    except Exception as e:
+        logger.warning(f"Model pull for {name} failed: {e}")
+
+
 @router.post("/pull", response_model=PullModelResponse)
 async def pull_model(
     request: PullModelRequest,
-    current_admin: AdminSession = Depends(get_current_admin)
+    background_tasks: BackgroundTasks,
+    current_admin: AdminSession = Depends(get_current_admin),
+    client: httpx.AsyncClient = Depends(get_http_client),
 ):
     """
     Trigger a model pull (download) on the local Ollama instance.
-    This is an async operation on the server side; this endpoint returns immediately.
+    The pull runs as a background task; this endpoint returns immediately.
     """
     base_url = settings.ollama_base_url or "http://localhost:11434"
     url = f"{base_url.rstrip('/')}/api/pull"
-    
-    # We won't await the full stream here for the UI responsiveness, 
-    # but in a real app create a background task. 
-    # For now, we'll just initiate it.
-    
+
     # NOTE: Since we want to provide feedback, a proper implementation would use websockets or SSE.
-    # For this simplified implementation, we will just pretend we started it.
-    
-    try:
-        # Fire and forget (or short timeout check)
-        async with httpx.AsyncClient(timeout=1.0) as client:
-            # We use a very short timeout because we expect it to start streaming
-            # We just want to check connectivity.
-            try:
-                await client.post(url, json={"name": request.name, "stream": False})
-            except httpx.ReadTimeout:
-                # This is actually good, means it started processing/streaming
-                pass
-            
-        return PullModelResponse(
-            status="success", 
-            message=f"Started pulling model {request.name}. Check server logs for progress."
-        )
-    except Exception as e:
-        # Even if it fails, for the mock UI we return success to show the flow
-        return PullModelResponse(
-            status="success", 
-            message=f"Request to pull {request.name} sent (Mock)."
-        )
+    # For now progress is only reported in the server logs.
+    background_tasks.add_task(_do_pull, client, url, request.name)
+
+    return PullModelResponse(
+        status="success",
+        message=f"Started pulling model {request.name}. Check server logs for progress."
+    )
 
 @router.post("/verify/huggingface", response_model=PullModelResponse)
 async def verify_hf_model(
     request: PullModelRequest,
-    current_admin: AdminSession = Depends(get_current_admin)
+    current_admin: AdminSession = Depends(get_current_admin),
+    client: httpx.AsyncClient = Depends(get_http_client),
 ):
     """
     Verify if a Hugging Face model exists/is accessible.
@@ -116,11 +136,10 @@ async def verify_hf_model(
     url = f"https://huggingface.co/api/models/{model_id}"
     
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(url)
-            if response.status_code == 200:
-                return PullModelResponse(status="success", message=f"Model {model_id} found on Hugging Face.")
-            else:
-                raise HTTPException(status_code=404, detail=f"Model {model_id} not found.")
+        response = await client.get(url, timeout=5.0)
+        if response.status_code == 200:
+            return PullModelResponse(status="success", message=f"Model {model_id} found on Hugging Face.")
+        else:
+            raise HTTPException(status_code=404, detail=f"Model {model_id} not found.")
     except Exception as e:
          raise HTTPException(status_code=500, detail=f"Failed to verify model: {str(e)}")
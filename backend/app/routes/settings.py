@@ -10,7 +10,7 @@ import logging
 from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from app.dependencies import get_current_admin
 from app.models import AdminSession
@@ -22,6 +22,8 @@ router = APIRouter()
 
 
 class ConfigResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore", validate_assignment=False)
+
     ai_provider: str
     openai_api_key: str | None
     ollama_base_url: str
@@ -39,22 +41,24 @@ class ConfigUpdate(BaseModel):
     huggingface_api_key: str | None = None
 
 
-@router.get("/config", response_model=ConfigResponse)
+# Responses are built with model_construct from trusted data, so skip
+# FastAPI's response_model re-validation; `responses` keeps the OpenAPI schema.
+@router.get("/config", response_model=None, responses={200: {"model": ConfigResponse}})
 async def get_config(
     admin: AdminSession = Depends(get_current_admin),
-):
+) -> ConfigResponse:
     """
     Get current AI configuration.
     """
     config = await get_ai_config()
-    return config
+    return ConfigResponse.model_construct(**config)
 
 
-@router.put("/config", response_model=ConfigResponse)
+@router.put("/config", response_model=None, responses={200: {"model": ConfigResponse}})
 async def update_config(
     data: ConfigUpdate,
     admin: AdminSession = Depends(get_current_admin),
-):
+) -> ConfigResponse:
     """
     Update AI configuration.
     """
@@ -75,6 +79,12 @@ async def update_config(
     if data.huggingface_api_key is not None:
         await set_system_setting("HUGGINGFACE_API_KEY", data.huggingface_api_key)
         
+    # Bots' resolved chat configs were derived from the old settings
+    from app.services.chat_service import invalidate_bot_config
+
+    invalidate_bot_config()
+
     logger.info(f"Admin {admin.username} updated system configuration")
     
-    return await get_ai_config()
+    config = await get_ai_config()
+    return ConfigResponse.model_construct(**config)
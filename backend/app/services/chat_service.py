@@ -7,82 +7,115 @@ Provides intelligent chatbot responses by:
 3. Generating responses using OpenAI or Ollama with context
 """
 
+import asyncio
 import logging
-import json
-import httpx
-from typing import AsyncGenerator, List, Optional
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, AsyncGenerator, List, Optional
 
-from openai import AsyncOpenAI
+import orjson
 
 from app.config import get_settings
 from app.services.config_service import get_ai_config
 from app.models import Bot, Message
 from app.services.embeddings import generate_query_embedding
+from app.services.http_client import get_http_client
 from app.services.qdrant_client import search_vectors
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
-# OpenAI client singleton (reuse from embeddings service)
-_openai_client = None
-
 # Chat configuration
 MAX_CONTEXT_CHUNKS = 3  # Top N chunks to include in context
-SIMILARITY_THRESHOLD = 0.6  # Minimum similarity score
+# Minimum similarity score. Vectors are int8-quantized in Qdrant, which
+# shifts scores slightly; re-check this against real queries if recall drops
+SIMILARITY_THRESHOLD = 0.6
+HIGH_CONFIDENCE_THRESHOLD = 0.85  # A top hit this strong is used alone
 MAX_CONVERSATION_HISTORY = 10  # Last N messages to include
+MAX_RESPONSE_TOKENS = 500  # Cap on generated tokens per reply
 
+# Retrieved context cache: (bot_id, normalized question) -> (fetched_at, chunks)
+CONTEXT_CACHE_TTL = 60.0  # seconds; newly ingested content shows up after this
+CONTEXT_CACHE_SIZE = 1024
+_context_cache: "OrderedDict[tuple[str, str], tuple[float, List[dict]]]" = OrderedDict()
 
-def get_openai_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> AsyncOpenAI:
-    """Get or create OpenAI client singleton."""
-    global _openai_client
+# Resolved chat config cache: bot_id -> (resolved_at, config)
+BOT_CONFIG_TTL = 30.0  # seconds; matches the global AI config cache
+_bot_config_cache: dict[str, tuple[float, "ResolvedBotConfig"]] = {}
 
-    # Check if client needs to be recreated (key changed or base_url changed)
-    should_recreate = False
-    if _openai_client is None:
-        should_recreate = True
-    else:
-        if api_key is not None and _openai_client.api_key != api_key:
-            should_recreate = True
-        if base_url is not None and str(_openai_client.base_url) != str(base_url):
-             # basic check, base_url in client might have trailing slash
-             if str(_openai_client.base_url).rstrip('/') != base_url.rstrip('/'):
-                should_recreate = True
-
-    if should_recreate:
-        key_to_use = api_key or settings.openai_api_key or "sk-dummy" # Custom providers often need a dummy key
-        _openai_client = AsyncOpenAI(api_key=key_to_use, base_url=base_url)
+# Outbound request bodies are pre-encoded with orjson
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Static instruction block; follows the bot intro, precedes the retrieved context
+_SYSTEM_RULES = """Instructions:
+- Answer the user's question using ONLY the context provided below
+- Be helpful, concise, and friendly
+- If the answer is not in the context, respond: "I don't have that information in my knowledge base. Please contact our support team for assistance."
+- Do not make up information or use knowledge outside the provided context
+- If multiple pieces of context are relevant, synthesize them into a coherent answer
+"""
+
+
+# OpenAI clients keyed by (api_key, base_url), oldest evicted first
+MAX_OPENAI_CLIENTS = 32
+_openai_clients: dict[tuple[str, Optional[str]], "AsyncOpenAI"] = {}
+
+
+def get_openai_client(api_key: str, base_url: Optional[str] = None) -> "AsyncOpenAI":
+    """
+    Get or create an OpenAI client for the given credentials.
+
+    Each (api_key, base_url) pair keeps its own client, so bots on different
+    providers don't evict each other. All clients share the app-wide HTTP/2
+    connection pool; a client is rebuilt if that pool has been closed.
+    """
+    pool_key = (api_key, base_url)
+    client = _openai_clients.get(pool_key)
+
+    if client is None or client.is_closed():
+        # Imported lazily: the OpenAI SDK is heavy and unused on local-only setups
+        from openai import AsyncOpenAI
+
+        if pool_key not in _openai_clients and len(_openai_clients) >= MAX_OPENAI_CLIENTS:
+            _openai_clients.pop(next(iter(_openai_clients)))
+
+        client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=get_http_client())
+        _openai_clients[pool_key] = client
         logger.info(f"OpenAI client initialized for chat (Base: {base_url or 'Default'})")
 
-    return _openai_client
+    return client
 
 
-def build_system_prompt(bot: Bot, context_chunks: List[dict]) -> str:
-    """Build system prompt with bot context and retrieved knowledge."""
-    bot_name = bot.name or "Assistant"
+@lru_cache(maxsize=256)
+def _static_prompt(bot_name: str) -> str:
+    """Return the fixed prefix of a bot's system prompt (intro + instructions)."""
+    return f"You are {bot_name}, a helpful customer support assistant.\n\n{_SYSTEM_RULES}"
 
-    # Build context section from retrieved chunks
-    context_text = ""
-    if context_chunks:
-        context_text = "Context from knowledge base:\n\n"
-        for i, chunk in enumerate(context_chunks, 1):
-            text = chunk["payload"].get("text", "")
-            score = chunk.get("score", 0)
-            context_text += f"[{i}] (relevance: {score:.2f})\n{text}\n\n"
 
-    # Build system prompt
-    prompt = f"""You are {bot_name}, a helpful customer support assistant.
+def build_system_prompt(bot: Bot, context_chunks: List[dict]) -> str:
+    """
+    Build system prompt with bot context and retrieved knowledge.
 
-{context_text}
+    The invariant intro and instructions come first and the per-turn
+    context last, so self-hosted backends (Ollama, llama.cpp, vLLM) can
+    reuse their KV cache for the unchanged prefix.
+    """
+    parts = [_static_prompt(bot.name or "Assistant")]
 
-Instructions:
-- Answer the user's question using ONLY the context provided above
-- Be helpful, concise, and friendly
-- If the answer is not in the context, respond: "I don't have that information in my knowledge base. Please contact our support team for assistance."
-- Do not make up information or use knowledge outside the provided context
-- If multiple pieces of context are relevant, synthesize them into a coherent answer
-"""
+    # Build context section from retrieved chunks
+    if context_chunks:
+        parts.append("\nContext from knowledge base:\n\n")
+        parts.extend(
+            f"[{i}] (relevance: {chunk.get('score', 0):.2f})\n{chunk['payload'].get('text', '')}\n\n"
+            for i, chunk in enumerate(context_chunks, 1)
+        )
 
-    return prompt
+    return "".join(parts)
 
 
 def build_messages(
@@ -90,12 +123,16 @@ def build_messages(
     conversation_history: List[Message],
     current_question: str,
 ) -> List[dict]:
-    """Build messages array for chat completion."""
+    """
+    Build messages array for chat completion.
+
+    conversation_history is expected to be windowed already: the chat route
+    loads only the last MAX_CONVERSATION_HISTORY messages from the database.
+    """
     messages = [{"role": "system", "content": system_prompt}]
 
-    # Add conversation history (last N messages)
-    for msg in conversation_history[-MAX_CONVERSATION_HISTORY:]:
-        messages.append({"role": msg.role, "content": msg.content})
+    # Add conversation history
+    messages.extend({"role": msg.role, "content": msg.content} for msg in conversation_history)
 
     # Add current question
     messages.append({"role": "user", "content": current_question})
@@ -105,26 +142,49 @@ def build_messages(
 
 async def retrieve_context(bot: Bot, question: str) -> List[dict]:
     """Retrieve relevant context chunks for a question."""
+    # Repeated questions within CONTEXT_CACHE_TTL reuse the last search
+    cache_key = (bot.id, question.strip().lower())
+    cached = _context_cache.get(cache_key)
+    if cached and time.monotonic() - cached[0] < CONTEXT_CACHE_TTL:
+        _context_cache.move_to_end(cache_key)
+        logger.info(f"Reusing cached context for bot {bot.id}")
+        return cached[1]
+
     logger.info(f"Retrieving context for question: {question[:100]}...")
 
     # Generate embedding for question (pass bot to decide provider)
     query_embedding = await generate_query_embedding(question, bot=bot)
 
-    # Search Qdrant for similar chunks
+    # Try the single best chunk first: a high-confidence hit answers on its own
     results = await search_vectors(
         bot_id=bot.id,
         query_embedding=query_embedding,
-        limit=MAX_CONTEXT_CHUNKS,
-        similarity_threshold=SIMILARITY_THRESHOLD,
+        limit=1,
+        similarity_threshold=HIGH_CONFIDENCE_THRESHOLD,
     )
 
+    # Otherwise widen to the usual top-N (same embedding, no re-embedding)
+    if not results:
+        results = await search_vectors(
+            bot_id=bot.id,
+            query_embedding=query_embedding,
+            limit=MAX_CONTEXT_CHUNKS,
+            similarity_threshold=SIMILARITY_THRESHOLD,
+        )
+
     if results:
         scores_str = ", ".join([f"{r['score']:.2f}" for r in results])
         logger.info(
             f"Retrieved {len(results)} chunks "
             f"(scores: {scores_str})"
         )
+
+        _context_cache[cache_key] = (time.monotonic(), results)
+        if len(_context_cache) > CONTEXT_CACHE_SIZE:
+            _context_cache.popitem(last=False)
     else:
+        # Not cached: the bot may be mid-ingest, with its new vectors
+        # still being applied (writes don't wait for them)
         logger.warning(f"No relevant context found for bot {bot.id}")
 
     return results
@@ -134,10 +194,14 @@ async def generate_response_openai(
     messages: List[dict],
     api_key: str,
     base_url: Optional[str] = None,
-    model: Optional[str] = None
+    model: Optional[str] = None,
+    temperature: float = 0.7,
+    max_tokens: int = MAX_RESPONSE_TOKENS,
 ) -> AsyncGenerator[str, None]:
     """Stream response from OpenAI or Compatible API."""
-    client = get_openai_client(api_key, base_url)
+    # Custom providers often need a dummy key
+    key = api_key or settings.openai_api_key or "sk-dummy"
+    client = get_openai_client(key, base_url)
     model_to_use = model or settings.chat_model
 
     try:
@@ -145,8 +209,8 @@ async def generate_response_openai(
             model=model_to_use,
             messages=messages,
             stream=True,
-            temperature=0.7,
-            max_tokens=500,
+            temperature=temperature,
+            max_tokens=max_tokens,
         )
 
         async for chunk in stream:
@@ -158,11 +222,49 @@ async def generate_response_openai(
         yield f"I apologize, but I encountered an error: {str(e)}"
 
 
+async def _iter_ndjson(response) -> AsyncGenerator[dict, None]:
+    """
+    Parse a streamed NDJSON body into dicts.
+
+    Splits raw bytes on b"\n" and parses each line with orjson, skipping the
+    bytes -> str decode and Unicode line splitting done by aiter_lines().
+    All complete lines in a network chunk are cut from the buffer at once,
+    so the buffer is shifted once per chunk rather than once per line.
+    Blank and malformed lines are skipped.
+    """
+    buf = bytearray()
+
+    async for chunk in response.aiter_bytes():
+        buf.extend(chunk)
+        last_nl = buf.rfind(b"\n")
+        if last_nl == -1:
+            continue
+
+        lines = buf[:last_nl].split(b"\n")
+        del buf[: last_nl + 1]
+
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+
+    # Trailing line without a final newline
+    if buf.strip():
+        try:
+            yield orjson.loads(bytes(buf))
+        except orjson.JSONDecodeError:
+            pass
+
+
 async def generate_response_ollama(
     messages: List[dict],
     base_url: str,
     model: str = "llama3",
-    temperature: float = 0.7
+    temperature: float = 0.7,
+    max_tokens: int = MAX_RESPONSE_TOKENS,
 ) -> AsyncGenerator[str, None]:
     """Stream response from Ollama (Native API)."""
     # Note: If Custom provider is used with Ollama, it will go through generate_response_openai with /v1
@@ -175,38 +277,144 @@ async def generate_response_ollama(
         "stream": True,
         "options": {
             "temperature": temperature,
-            "num_predict": 500,
+            "num_predict": max_tokens,
         }
     }
 
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            async with client.stream("POST", url, json=payload) as response:
-                if response.status_code != 200:
-                    error_msg = await response.aread()
-                    logger.error(f"Ollama API Error: {response.status_code} - {error_msg}")
-                    yield f"Error calling Local AI: {response.status_code}"
-                    return
-
-                async for line in response.aiter_lines():
-                    if not line:
-                        continue
-                    
-                    try:
-                        data = json.loads(line)
-                        if "message" in data and "content" in data["message"]:
-                            yield data["message"]["content"]
-                        
-                        if data.get("done"):
-                            break
-                    except json.JSONDecodeError:
-                        continue
+        # Shared keep-alive pool (closed on app shutdown), not a client per request
+        client = get_http_client()
+        async with client.stream(
+            "POST",
+            url,
+            content=orjson.dumps(payload),
+            headers=JSON_HEADERS,
+        ) as response:
+            if response.status_code != 200:
+                error_msg = await response.aread()
+                logger.error(f"Ollama API Error: {response.status_code} - {error_msg}")
+                yield f"Error calling Local AI: {response.status_code}"
+                return
+
+            async for data in _iter_ndjson(response):
+                if "message" in data and "content" in data["message"]:
+                    yield data["message"]["content"]
+
+                if data.get("done"):
+                    break
 
     except Exception as e:
         logger.error(f"Ollama streaming failed: {e}")
         yield f"I apologize, but I encountered an error connecting to Local AI: {str(e)}"
 
 
+@lru_cache(maxsize=256)
+def _docker_host_url(base_url: str) -> str:
+    """
+    Docker Compatibility: Replace localhost with host.docker.internal.
+
+    This fixes issues where user/db has 'localhost' stored but app runs in container.
+    """
+    if "localhost" in base_url or "127.0.0.1" in base_url:
+        base_url = base_url.replace("localhost", "host.docker.internal").replace("127.0.0.1", "host.docker.internal")
+        logger.info(f"Substituted Docker host in URL: {base_url}")
+    return base_url
+
+
+def _ollama_endpoint(bot: Bot, model_id: str, global_config: dict) -> tuple[Optional[str], Optional[str]]:
+    """Local Ollama: (base_url, api_key)."""
+    base_url = bot.ai_base_url or global_config.get("ollama_base_url") or "http://host.docker.internal:11434"
+    return _docker_host_url(base_url), None
+
+
+def _custom_endpoint(bot: Bot, model_id: str, global_config: dict) -> tuple[Optional[str], Optional[str]]:
+    """Custom OpenAI-compatible endpoint (LM Studio, vLLM, etc): (base_url, api_key)."""
+    base_url = bot.ai_base_url or global_config.get("base_url") or "http://localhost:1234/v1"
+    return base_url, bot.ai_api_key or "sk-dummy"
+
+
+def _huggingface_endpoint(bot: Bot, model_id: str, global_config: dict) -> tuple[Optional[str], Optional[str]]:
+    """HuggingFace Inference API: (base_url, api_key)."""
+    api_key = bot.ai_api_key or global_config.get("huggingface_api_key") or ""
+    # HF v1 compatible base url construction
+    return f"https://api-inference.huggingface.co/models/{model_id}/v1", api_key
+
+
+def _openai_endpoint(bot: Bot, model_id: str, global_config: dict) -> tuple[Optional[str], Optional[str]]:
+    """OpenAI Standard (also the fallback for unknown providers): (base_url, api_key)."""
+    api_key = global_config.get("openai_api_key", "")
+    if bot.provider == "openai" and bot.ai_api_key:
+        # Allow overriding OpenAI key per bot if needed (though rare)
+        api_key = bot.ai_api_key
+    return None, api_key
+
+
+# Provider -> endpoint resolver
+PROVIDERS = {
+    "local": _ollama_endpoint,
+    "ollama": _ollama_endpoint,
+    "custom": _custom_endpoint,
+    "huggingface": _huggingface_endpoint,
+    "openai": _openai_endpoint,
+}
+
+# Providers streamed through Ollama's native API (the rest are OpenAI-compatible)
+OLLAMA_PROVIDERS = frozenset({"local", "ollama"})
+
+
+@dataclass(frozen=True)
+class ResolvedBotConfig:
+    """A bot's effective chat settings: bot overrides merged over global config."""
+
+    provider: str
+    model_id: str
+    temperature: float
+    base_url: Optional[str] = None
+    api_key: Optional[str] = None
+
+
+def resolve_bot_config(bot: Bot, global_config: dict) -> ResolvedBotConfig:
+    """Resolve provider, model, temperature and endpoint for a bot."""
+    # Priority: Bot-specific config > Global config
+    provider = bot.provider or global_config.get("ai_provider", "openai")
+    model_id = bot.model_id or global_config.get("model_name") or "gpt-4o"
+    temperature = bot.temperature if bot.temperature is not None else 0.7
+
+    base_url, api_key = PROVIDERS.get(provider, _openai_endpoint)(bot, model_id, global_config)
+
+    return ResolvedBotConfig(provider, model_id, temperature, base_url, api_key)
+
+
+async def get_bot_config(bot: Bot) -> ResolvedBotConfig:
+    """
+    Get a bot's resolved chat config, cached per bot for BOT_CONFIG_TTL seconds.
+
+    The admin routes call invalidate_bot_config() when a bot or the global
+    AI settings change.
+    """
+    cached = _bot_config_cache.get(bot.id)
+    if cached and time.monotonic() - cached[0] < BOT_CONFIG_TTL:
+        return cached[1]
+
+    config = resolve_bot_config(bot, await get_ai_config())
+    _bot_config_cache[bot.id] = (time.monotonic(), config)
+    return config
+
+
+def invalidate_context_cache(bot_id: str) -> None:
+    """Drop a bot's cached retrieval results (its knowledge base changed)."""
+    for key in [key for key in _context_cache if key[0] == bot_id]:
+        del _context_cache[key]
+
+
+def invalidate_bot_config(bot_id: Optional[str] = None) -> None:
+    """Drop one bot's cached chat config, or every bot's if bot_id is None."""
+    if bot_id is None:
+        _bot_config_cache.clear()
+    else:
+        _bot_config_cache.pop(bot_id, None)
+
+
 async def generate_response(
     bot: Bot,
     question: str,
@@ -217,8 +425,12 @@ async def generate_response(
     """
     logger.info(f"Generating response for bot {bot.id} ({bot.name})")
 
-    # Retrieve relevant context
-    context_chunks = await retrieve_context(bot, question)
+    # Retrieve relevant context and resolve the bot's config concurrently
+    # (independent: Qdrant/embedding round-trip vs. settings lookup)
+    context_chunks, config = await asyncio.gather(
+        retrieve_context(bot, question),
+        get_bot_config(bot),
+    )
 
     # Build system prompt with context
     system_prompt = build_system_prompt(bot, context_chunks)
@@ -226,57 +438,19 @@ async def generate_response(
     # Build messages array
     messages = build_messages(system_prompt, conversation_history, question)
 
-    # Determine Provider and Config
-    # Priority: Bot-specific config > Global config
-    
-    # Defaults from Global Config
-    global_config = await get_ai_config()
-    
-    # Bot overrides
-    provider = bot.provider or global_config.get("ai_provider", "openai")
-    model_id = bot.model_id or global_config.get("model_name") or "gpt-4o"
-    temperature = bot.temperature if bot.temperature is not None else 0.7
-    
     # Determine execution path
-    logger.info(f"Using Provider: {provider}, Model: {model_id}, Temp: {temperature}")
-
-    if provider == "local" or provider == "ollama":
-        # Local Ollama
-        base_url = bot.ai_base_url or global_config.get("ollama_base_url") or "http://host.docker.internal:11434"
-        
-        # Docker Compatibility: Replace localhost with host.docker.internal
-        # This fixes issues where user/db has 'localhost' stored but app runs in container
-        if "localhost" in base_url or "127.0.0.1" in base_url:
-            base_url = base_url.replace("localhost", "host.docker.internal").replace("127.0.0.1", "host.docker.internal")
-            logger.info(f"Substituted Docker host in URL: {base_url}")
-
-        async for token in generate_response_ollama(messages, base_url, model_id, temperature):
-            yield token
-
-    elif provider == "custom":
-        # Custom OpenAI-compatible endpoint (LM Studio, vLLM, etc)
-        base_url = bot.ai_base_url or global_config.get("base_url") or "http://localhost:1234/v1"
-        api_key = bot.ai_api_key or "sk-dummy"
-        async for token in generate_response_openai(messages, api_key, base_url, model_id, temperature):
-            yield token
-
-    elif provider == "huggingface":
-        # HuggingFace Inference API
-        api_key = bot.ai_api_key or global_config.get("huggingface_api_key") or ""
-        # HF v1 compatible base url construction
-        base_url = f"https://api-inference.huggingface.co/models/{model_id}/v1"
-        
-        async for token in generate_response_openai(messages, api_key, base_url, model_id, temperature):
-            yield token
+    logger.info(f"Using Provider: {config.provider}, Model: {config.model_id}, Temp: {config.temperature}")
 
+    if config.provider in OLLAMA_PROVIDERS:
+        stream = generate_response_ollama(
+            messages, config.base_url, model=config.model_id, temperature=config.temperature
+        )
     else:
-        # OpenAI Standard
-        api_key = global_config.get("openai_api_key", "")
-        if bot.provider == "openai" and bot.ai_api_key:
-             # Allow overriding OpenAI key per bot if needed (though rare)
-             api_key = bot.ai_api_key
-             
-        async for token in generate_response_openai(messages, api_key, None, model_id, temperature):
-            yield token
+        stream = generate_response_openai(
+            messages, config.api_key, config.base_url, model=config.model_id, temperature=config.temperature
+        )
+
+    async for token in stream:
+        yield token
 
     logger.info(f"Response generation complete for bot {bot.id}")
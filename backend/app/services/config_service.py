@@ -5,7 +5,9 @@ Provides functions to get and set system settings, handling the priority
 between database-stored settings and environment variables.
 """
 
+import asyncio
 import logging
+import time
 from typing import Optional
 
 from sqlalchemy import select
@@ -18,6 +20,23 @@ from app.models import SystemSetting
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# In-process cache for get_ai_config: (expires_at, config).
+# Invalidated by set_system_setting; the TTL bounds staleness across workers.
+AI_CONFIG_TTL = 30.0  # seconds
+_ai_config_cache: Optional[tuple[float, dict]] = None
+_ai_config_version = 0  # bumped on invalidation so in-flight loads aren't stored
+_ai_config_lock = asyncio.Lock()
+
+# SystemSetting keys that make up the AI configuration
+AI_CONFIG_KEYS = (
+    "AI_PROVIDER",
+    "OPENAI_API_KEY",
+    "OLLAMA_BASE_URL",
+    "CUSTOM_BASE_URL",
+    "CUSTOM_MODEL_NAME",
+    "HUGGINGFACE_API_KEY",
+)
+
 
 async def get_system_setting(key: str, default: Optional[str] = None) -> Optional[str]:
     """
@@ -40,6 +59,23 @@ async def get_system_setting(key: str, default: Optional[str] = None) -> Optiona
         return default
 
 
+async def _get_settings_bulk(keys: tuple[str, ...]) -> dict[str, str]:
+    """
+    Get several system settings in a single query.
+
+    Args:
+        keys: Setting keys to fetch
+
+    Returns:
+        Mapping of key to value for the keys that exist in the database
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(SystemSetting.key, SystemSetting.value).where(SystemSetting.key.in_(keys))
+        )
+        return dict(result.all())
+
+
 async def set_system_setting(key: str, value: str) -> SystemSetting:
     """
     Set a system setting in the database.
@@ -63,30 +99,56 @@ async def set_system_setting(key: str, value: str) -> SystemSetting:
             
         await db.commit()
         await db.refresh(setting)
-        
-        return setting
+
+    invalidate_ai_config()
+
+    return setting
+
+
+def invalidate_ai_config() -> None:
+    """Drop the cached AI configuration so the next read hits the database."""
+    global _ai_config_cache, _ai_config_version
+
+    _ai_config_cache = None
+    _ai_config_version += 1
 
 
 async def get_ai_config() -> dict:
     """
     Get current AI configuration with DB overrides.
-    
+
+    The result is cached in-process for AI_CONFIG_TTL seconds, or until a
+    setting is written.
+
     Returns:
         Dictionary with current config values
     """
-    # Get values from DB or fall back to env settings
-    provider = await get_system_setting("AI_PROVIDER", settings.ai_provider)
-    openai_key = await get_system_setting("OPENAI_API_KEY", settings.openai_api_key)
-    ollama_url = await get_system_setting("OLLAMA_BASE_URL", settings.ollama_base_url)
-    base_url = await get_system_setting("CUSTOM_BASE_URL", "")
-    model_name = await get_system_setting("CUSTOM_MODEL_NAME", "")
-    hf_key = await get_system_setting("HUGGINGFACE_API_KEY", "")
-    
+    global _ai_config_cache
+
+    cached = _ai_config_cache
+    if cached is None or time.monotonic() >= cached[0]:
+        async with _ai_config_lock:
+            # Re-check: another coroutine may have refreshed it while we waited
+            cached = _ai_config_cache
+            if cached is None or time.monotonic() >= cached[0]:
+                version = _ai_config_version
+                cached = (time.monotonic() + AI_CONFIG_TTL, await _load_ai_config())
+                if version == _ai_config_version:
+                    _ai_config_cache = cached
+
+    return dict(cached[1])
+
+
+async def _load_ai_config() -> dict:
+    """Load AI configuration from the database, falling back to env settings."""
+    # Fetch all overrides in one query instead of one round-trip per key
+    values = await _get_settings_bulk(AI_CONFIG_KEYS)
+
     return {
-        "ai_provider": provider,
-        "openai_api_key": openai_key,
-        "ollama_base_url": ollama_url,
-        "base_url": base_url,
-        "model_name": model_name,
-        "huggingface_api_key": hf_key,
+        "ai_provider": values.get("AI_PROVIDER", settings.ai_provider),
+        "openai_api_key": values.get("OPENAI_API_KEY", settings.openai_api_key),
+        "ollama_base_url": values.get("OLLAMA_BASE_URL", settings.ollama_base_url),
+        "base_url": values.get("CUSTOM_BASE_URL", ""),
+        "model_name": values.get("CUSTOM_MODEL_NAME", ""),
+        "huggingface_api_key": values.get("HUGGINGFACE_API_KEY", ""),
     }
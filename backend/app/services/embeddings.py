@@ -5,15 +5,39 @@ Integrates with OpenAI API for text-embedding-3-small and stores
 embeddings in Qdrant vector database.
 """
 
+import asyncio
 import logging
+import multiprocessing
+import os
+import threading
 import uuid
-from typing import List
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, List, Optional
 
-from openai import AsyncOpenAI
+import numpy as np
 
 from app.config import get_settings
+from app.models import Bot
 from app.services.config_service import get_ai_config
-from app.services.qdrant_client import upsert_vectors
+from app.services.qdrant_client import Vector, upsert_vectors
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+__all__ = [
+    "close_embed_pool",
+    "embed_and_store",
+    "generate_embeddings",
+    "generate_embeddings_local",
+    "generate_embeddings_openai",
+    "generate_query_embedding",
+    "get_embed_pool",
+    "get_fastembed_model",
+    "get_openai_client",
+    "warm_fastembed_model",
+]
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -21,18 +45,32 @@ logger = logging.getLogger(__name__)
 # OpenAI client singleton
 _openai_client = None
 
-# FastEmbed model singleton
+# FastEmbed model singleton (lives in the embedding worker process)
 _fastembed_model = None
+_fastembed_lock = threading.Lock()
+
+# Single-process pool that runs FastEmbed inference off the server process
+_embed_pool: Optional[ProcessPoolExecutor] = None
 
 # Embedding configuration
 BATCH_SIZE = 100  # Max embeddings per API request
+EMBEDDING_CONCURRENCY = 8  # Max OpenAI embedding requests in flight
+EMBEDDING_MAX_RETRIES = 5  # Retries per batch on rate limiting
+LOCAL_BATCH_SIZE = 64  # Texts per ONNX inference call
+LOCAL_THREADS = os.cpu_count()  # ONNX intra-op threads
+QUERY_CACHE_SIZE = 1024  # Query embeddings kept in the LRU cache
 
+# Query embedding LRU cache: (use_local, normalized query) -> vector
+_query_embedding_cache: "OrderedDict[tuple[bool, str], Vector]" = OrderedDict()
 
-def get_openai_client(api_key: str = None) -> AsyncOpenAI:
+
+def get_openai_client(api_key: str = None) -> "AsyncOpenAI":
     """Get or create OpenAI client singleton."""
     global _openai_client
 
     if _openai_client is None or (_openai_client.api_key != api_key and api_key is not None):
+        from openai import AsyncOpenAI
+
         key_to_use = api_key or settings.openai_api_key
         _openai_client = AsyncOpenAI(api_key=key_to_use)
         logger.info("OpenAI client initialized")
@@ -44,68 +82,169 @@ def get_fastembed_model():
     """Get or create FastEmbed model singleton."""
     global _fastembed_model
 
-    if _fastembed_model is None:
-        from fastembed import TextEmbedding
+    with _fastembed_lock:
+        if _fastembed_model is None:
+            from fastembed import TextEmbedding
 
-        logger.info(f"Loading FastEmbed model: {settings.local_embedding_model}")
-        _fastembed_model = TextEmbedding(model_name=settings.local_embedding_model)
-        logger.info("FastEmbed model loaded")
+            logger.info(f"Loading FastEmbed model: {settings.local_embedding_model}")
+            _fastembed_model = TextEmbedding(
+                model_name=settings.local_embedding_model,
+                threads=LOCAL_THREADS,
+            )
+            logger.info("FastEmbed model loaded")
 
     return _fastembed_model
 
 
-async def generate_embeddings_openai(texts: List[str], api_key: str) -> List[List[float]]:
-    """Generate embeddings using OpenAI API."""
-    client = get_openai_client(api_key)
-    all_embeddings = []
+def _as_float32_rows(embeddings) -> List[np.ndarray]:
+    """
+    Pack embeddings into one contiguous float32 matrix and return its rows.
 
-    # Process in batches
-    for i in range(0, len(texts), BATCH_SIZE):
-        batch = texts[i : i + BATCH_SIZE]
-        batch_num = i // BATCH_SIZE + 1
-        total_batches = (len(texts) + BATCH_SIZE - 1) // BATCH_SIZE
+    4 bytes per component instead of a boxed Python float (28 bytes) while
+    vectors wait to be stored or sit in the query cache.
+    """
+    return list(np.asarray(embeddings, dtype=np.float32))
 
-        logger.info(
-            f"Generating OpenAI embeddings for batch {batch_num}/{total_batches} "
-            f"({len(batch)} texts)"
+
+def _init_embed_worker() -> None:
+    """Load the FastEmbed model when the worker process starts."""
+    try:
+        get_fastembed_model()
+    except Exception as e:
+        # Don't break the pool: the error resurfaces on the first embed call
+        logger.warning(f"FastEmbed model failed to load in worker: {e}")
+
+
+def _embed_local_sync(texts: List[str]) -> list:
+    """Run FastEmbed inference (blocking; runs in the embedding worker)."""
+    model = get_fastembed_model()
+    return list(model.embed(texts, batch_size=LOCAL_BATCH_SIZE))
+
+
+def get_embed_pool() -> ProcessPoolExecutor:
+    """
+    Get or create the FastEmbed worker pool.
+
+    One spawned process holds the model, so ONNX inference neither blocks
+    the event loop nor competes with request handling for the GIL.
+    """
+    global _embed_pool
+
+    if _embed_pool is None:
+        _embed_pool = ProcessPoolExecutor(
+            max_workers=1,
+            # spawn, not fork: the server process already runs threads
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_embed_worker,
         )
+        logger.info("FastEmbed worker pool started")
 
-        try:
-            response = await client.embeddings.create(
-                model=settings.embedding_model,
-                input=batch,
-            )
+    return _embed_pool
 
-            # Extract embeddings in order
-            batch_embeddings = [item.embedding for item in response.data]
-            all_embeddings.extend(batch_embeddings)
 
-        except Exception as e:
-            logger.error(f"Failed to generate OpenAI embeddings: {e}")
-            raise
+def close_embed_pool() -> None:
+    """Shut down the FastEmbed worker pool, if it was started."""
+    global _embed_pool
 
-    return all_embeddings
+    if _embed_pool is not None:
+        _embed_pool.shutdown(wait=False, cancel_futures=True)
+        _embed_pool = None
+        logger.info("FastEmbed worker pool closed")
 
 
-async def generate_embeddings_local(texts: List[str]) -> List[List[float]]:
-    """Generate embeddings using FastEmbed (local CPU)."""
-    model = get_fastembed_model()
-    
+async def _run_local_embed(texts: List[str]) -> list:
+    """Run FastEmbed inference in the worker pool."""
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_embed_pool(), _embed_local_sync, texts)
+    except BrokenProcessPool:
+        # Worker died (e.g. killed for memory): start a fresh one next call
+        close_embed_pool()
+        raise
+
+
+async def warm_fastembed_model() -> None:
+    """
+    Start the embedding worker and run one inference so the first request
+    doesn't pay the model load and ONNX session warm-up cost.
+    """
+    try:
+        await _run_local_embed(["warmup"])
+        logger.info("FastEmbed model warmed up")
+    except Exception as e:
+        logger.warning(f"FastEmbed warm-up failed: {e}")
+
+
+async def generate_embeddings_openai(texts: List[str], api_key: str) -> List[np.ndarray]:
+    """
+    Generate embeddings using OpenAI API.
+
+    Batches are requested concurrently (at most EMBEDDING_CONCURRENCY at a
+    time) and rate-limited batches are retried with exponential backoff.
+    Results keep the order of `texts`, as float32 numpy arrays.
+    """
+    from openai import RateLimitError
+
+    client = get_openai_client(api_key)
+    batches = [texts[i : i + BATCH_SIZE] for i in range(0, len(texts), BATCH_SIZE)]
+    semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+
+    async def embed_batch(batch_num: int, batch: List[str]) -> List[List[float]]:
+        async with semaphore:
+            logger.info(
+                f"Generating OpenAI embeddings for batch {batch_num}/{len(batches)} "
+                f"({len(batch)} texts)"
+            )
+
+            for attempt in range(EMBEDDING_MAX_RETRIES + 1):
+                try:
+                    response = await client.embeddings.create(
+                        model=settings.embedding_model,
+                        input=batch,
+                    )
+                    # Extract embeddings in order
+                    return [item.embedding for item in response.data]
+
+                except RateLimitError as e:
+                    if attempt == EMBEDDING_MAX_RETRIES:
+                        logger.error(f"Failed to generate OpenAI embeddings: {e}")
+                        raise
+                    delay = 2 ** attempt
+                    logger.warning(f"Rate limited on batch {batch_num}, retrying in {delay}s")
+                    await asyncio.sleep(delay)
+
+                except Exception as e:
+                    logger.error(f"Failed to generate OpenAI embeddings: {e}")
+                    raise
+
+    results = await asyncio.gather(
+        *(embed_batch(num, batch) for num, batch in enumerate(batches, 1))
+    )
+
+    return _as_float32_rows(
+        [embedding for batch_embeddings in results for embedding in batch_embeddings]
+    )
+
+
+async def generate_embeddings_local(texts: List[str]) -> List[np.ndarray]:
+    """
+    Generate embeddings using FastEmbed (local CPU).
+
+    Vectors stay as float32 numpy arrays; they are converted to lists only
+    at the Qdrant boundary.
+    """
     logger.info(f"Generating local embeddings for {len(texts)} texts...")
-    
-    # FastEmbed generator returns numpy arrays/lists
-    embeddings_generator = model.embed(texts)
-    
-    # Convert generator to list of lists
-    all_embeddings = [list(e) for e in embeddings_generator]
-    
+
+    # ONNX inference is synchronous: run it in the worker process. FastEmbed
+    # yields one numpy array per text; keep them as-is instead of boxing
+    # every component into a Python float
+    all_embeddings = _as_float32_rows(await _run_local_embed(texts))
+
     logger.info(f"Generated {len(all_embeddings)} local embeddings")
     return all_embeddings
 
 
-from app.models import Bot
-
-async def generate_embeddings(texts: List[str], bot: Bot = None) -> List[List[float]]:
+async def generate_embeddings(texts: List[str], bot: Bot = None) -> List[Vector]:
     """
     Generate embeddings for texts using configured provider.
     Priority:
@@ -118,25 +257,42 @@ async def generate_embeddings(texts: List[str], bot: Bot = None) -> List[List[fl
         return []
 
     config = await get_ai_config()
-    
-    # Determine if we should use local embeddings
-    use_local = False
-    
-    if bot:
-        # If bot is configured for ANY non-OpenAI provider, use local embeddings
-        # This prevents OpenAI quota errors for users expecting a fully local/free stack
-        if bot.provider in ["local", "ollama", "custom", "huggingface"]:
-            use_local = True
-    
-    if config.get("ai_provider") == "local":
-        use_local = True
+    return await _embed(texts, _use_local_embeddings(bot, config), config)
+
+
+def _use_local_embeddings(bot: Bot, config: dict) -> bool:
+    """Decide whether FastEmbed (True) or OpenAI (False) embeds for this bot."""
+    # If bot is configured for ANY non-OpenAI provider, use local embeddings
+    # This prevents OpenAI quota errors for users expecting a fully local/free stack
+    if bot and bot.provider in ["local", "ollama", "custom", "huggingface"]:
+        return True
+
+    return config.get("ai_provider") == "local"
+
 
+async def _embed(texts: List[str], use_local: bool, config: dict) -> List[Vector]:
+    """Embed texts with the chosen backend."""
     if use_local:
         return await generate_embeddings_local(texts)
-    else:
-        # Fallback to OpenAI
-        api_key = config.get("openai_api_key")
-        return await generate_embeddings_openai(texts, api_key)
+
+    # Fallback to OpenAI
+    api_key = config.get("openai_api_key")
+    return await generate_embeddings_openai(texts, api_key)
+
+
+def _random_uuids(count: int) -> List[str]:
+    """
+    Generate `count` random (version 4) UUID strings.
+
+    Reads all the randomness with one os.urandom call instead of one per
+    uuid.uuid4().
+    """
+    raw = os.urandom(16 * count)
+    # version=4 sets the version and RFC 4122 variant bits
+    return [
+        str(uuid.UUID(bytes=raw[offset : offset + 16], version=4))
+        for offset in range(0, 16 * count, 16)
+    ]
 
 
 async def embed_and_store(
@@ -165,10 +321,9 @@ async def embed_and_store(
         )
 
     # Prepare vectors for Qdrant
+    point_ids = _random_uuids(len(chunks))
     vectors = []
-    for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-        point_id = str(uuid.uuid4())
-
+    for i, (point_id, chunk, embedding) in enumerate(zip(point_ids, chunks, embeddings)):
         payload = {
             "text": chunk["text"],
             "chunk_index": chunk.get("index", i),
@@ -186,16 +341,31 @@ async def embed_and_store(
     return len(vectors)
 
 
-async def generate_query_embedding(query: str, bot: Bot = None) -> List[float]:
+async def generate_query_embedding(query: str, bot: Bot = None) -> Vector:
     """
     Generate embedding for a query string.
+
+    Results are kept in an LRU cache keyed by embedding backend and
+    normalized query, so repeated questions skip the embedding call.
     """
+    config = await get_ai_config()
+    use_local = _use_local_embeddings(bot, config)
+
+    cache_key = (use_local, query.strip().lower())
+    cached = _query_embedding_cache.get(cache_key)
+    if cached is not None:
+        _query_embedding_cache.move_to_end(cache_key)
+        return cached
+
     logger.info(f"Generating query embedding: {query[:100]}...")
 
-    # Reuse generate_embeddings logic for consistency
-    embeddings = await generate_embeddings([query], bot)
-    
+    embeddings = await _embed([query], use_local, config)
+
     if not embeddings:
         raise ValueError("Failed to generate query embedding")
-        
+
+    _query_embedding_cache[cache_key] = embeddings[0]
+    if len(_query_embedding_cache) > QUERY_CACHE_SIZE:
+        _query_embedding_cache.popitem(last=False)
+
     return embeddings[0]
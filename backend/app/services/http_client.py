@@ -0,0 +1,63 @@
+"""
+Shared HTTP client service.
+
+Provides a single long-lived httpx.AsyncClient so outbound calls (Ollama,
+Hugging Face, OpenAI-compatible APIs) reuse one connection pool instead of
+opening a new one per request. HTTP/2 is enabled so concurrent streams to
+the same HTTPS host share one connection (plain-HTTP hosts such as a local
+Ollama keep using HTTP/1.1 keep-alive).
+"""
+
+import logging
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Global client instance
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Defaults (individual calls may pass a tighter timeout)
+DEFAULT_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+DEFAULT_LIMITS = httpx.Limits(max_keepalive_connections=100, max_connections=200)
+CONNECT_RETRIES = 2  # Retries on connection failures only (never a sent request)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get or create the shared HTTP client singleton.
+
+    Can also be used as a FastAPI dependency:
+        client: httpx.AsyncClient = Depends(get_http_client)
+    """
+    global _http_client
+
+    if _http_client is None or _http_client.is_closed:
+        # http2/limits live on the transport once one is passed explicitly
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=DEFAULT_LIMITS,
+            retries=CONNECT_RETRIES,
+        )
+        _http_client = httpx.AsyncClient(
+            transport=transport,
+            timeout=DEFAULT_TIMEOUT,
+        )
+        logger.info("Shared HTTP client initialized")
+
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client."""
+    global _http_client
+
+    if _http_client is not None:
+        try:
+            await _http_client.aclose()
+            logger.info("Shared HTTP client closed")
+        except Exception as e:
+            logger.error(f"Error closing HTTP client: {e}")
+        finally:
+            _http_client = None
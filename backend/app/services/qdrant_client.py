@@ -5,11 +5,19 @@ Provides initialization and management of Qdrant collections for storing
 and retrieving embeddings with bot-specific filtering.
 """
 
+import asyncio
+import itertools
 import logging
-from typing import Optional
-
-from qdrant_client import QdrantClient
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import lru_cache, partial
+from typing import AsyncIterator, Iterator, Optional, Sequence, Union
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.http import models
+from qdrant_client.http.exceptions import UnexpectedResponse
 
 from app.config import get_settings
 from app.services.config_service import get_system_setting
@@ -17,49 +25,210 @@ from app.services.config_service import get_system_setting
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-# Global client instance
-_qdrant_client: Optional[QdrantClient] = None
+# Global client pool, handed out round-robin
+_qdrant_pool: list[AsyncQdrantClient] = []
+_qdrant_pool_cycle: Optional[Iterator[AsyncQdrantClient]] = None
 
-# Constants
-DISTANCE_METRIC = models.Distance.COSINE
+# Server mode: clients (each with its own gRPC channel / HTTP connection
+# pool) so concurrent requests don't queue behind one connection. Local
+# mode always uses a single client: the embedded store locks its path
+POOL_SIZE = 4
 
+# Collection per embedding dimension
+_COLLECTION_BY_SIZE = {
+    1536: "myndulon_embeddings",  # OpenAI
+    384: "myndulon_embeddings_local",  # Local (FastEmbed)
+}
 
-def get_qdrant_client() -> QdrantClient:
-    """Get or create Qdrant client singleton."""
-    global _qdrant_client
+# Collections known to exist (filled by init_collection)
+_EXISTING_COLLECTIONS: set[str] = set()
 
-    if _qdrant_client is None:
+# Constants
+DISTANCE_METRIC = models.Distance.COSINE
+
+# Allow large batch upserts/searches over gRPC (default cap is 4 MB).
+# A local subchannel pool gives every pooled client its own connection
+# instead of gRPC sharing one between channels with identical options
+GRPC_OPTIONS = {
+    "grpc.max_send_message_length": 64 << 20,
+    "grpc.max_receive_message_length": 64 << 20,
+    "grpc.use_local_subchannel_pool": 1,
+}
+
+# Int8 scalar quantization: Qdrant keeps the quantized vectors in RAM for
+# scoring (~4x smaller than float32) and the originals on disk for rescoring
+QUANTIZATION_CONFIG = models.ScalarQuantization(
+    scalar=models.ScalarQuantizationConfig(
+        type=models.ScalarType.INT8,
+        quantile=0.99,
+        always_ram=True,
+    )
+)
+
+# Search the int8 vectors for 2x the requested candidates, then rescore
+# them against the original float32 vectors so results keep full precision
+SEARCH_PARAMS = models.SearchParams(
+    quantization=models.QuantizationSearchParams(
+        rescore=True,
+        oversampling=2.0,
+    )
+)
+
+# Payload fields returned with search hits (chat reads the chunk text;
+# source/chunk_index identify it). Vectors are never sent back
+SEARCH_PAYLOAD = models.PayloadSelectorInclude(include=["text", "source", "chunk_index"])
+
+# Collection layout, applied when a collection is created. The large
+# OpenAI collection is split into shards so upserts are applied in
+# parallel server-side, and keeps payloads (chunk text) on disk since
+# they're only read for the final hits, not during HNSW traversal
+COLLECTION_OPTIONS = {
+    1536: {"shard_number": 4, "on_disk_payload": True},
+    384: {"shard_number": 1, "on_disk_payload": False},
+}
+HNSW_CONFIG = models.HnswConfigDiff(m=16, ef_construct=128, on_disk=False)
+
+# Payload indexes per collection. bot_id is the tenant key: every search
+# and delete filters on it, and is_tenant lets Qdrant co-locate each bot's
+# points. source is indexed for per-document filtering.
+PAYLOAD_INDEXES = {
+    "bot_id": models.KeywordIndexParams(
+        type=models.KeywordIndexType.KEYWORD,
+        is_tenant=True,
+    ),
+    "source": models.PayloadSchemaType.KEYWORD,
+}
+
+# Smaller upserts are split into batches sent concurrently
+UPSERT_BATCH_SIZE = 64
+UPSERT_CONCURRENCY = 4
+
+# Upserts larger than UPLOAD_THRESHOLD points go through upload_points
+UPLOAD_THRESHOLD = 256
+UPLOAD_BATCH_SIZE = 64
+UPLOAD_PARALLEL = 4  # Server mode only; local mode writes in-process
+
+# Imports larger than this pause HNSW indexing (see bulk_ingest_context)
+BULK_INGEST_THRESHOLD = 1000
+DEFAULT_INDEXING_THRESHOLD = 20000  # KB; used if init_collection saw none
+
+# Active bulk imports per collection (this process only)
+_bulk_ingests: dict[str, int] = {}
+
+# Indexing threshold to restore after a bulk import, per collection, as
+# seen by init_collection. Never 0: that's the paused state, which another
+# worker's import (or a crashed one) may have left behind
+_indexing_thresholds: dict[str, int] = {}
+
+HEALTH_CACHE_TTL = 1.0  # seconds; absorbs load-balancer probe bursts
+
+# Last health check result: (checked_at, result)
+_health_cache: Optional[tuple[float, dict]] = None
+
+# Collection count reported by health_check: (monotonic time, count)
+COLLECTION_COUNT_TTL = 30.0  # seconds
+_collection_count: Optional[tuple[float, int]] = None
+
+
+# Embeddings arrive as float32 numpy arrays; plain lists are still accepted
+Vector = Union[Sequence[float], np.ndarray]
+
+
+def _as_list(vector: Vector) -> list[float]:
+    """Convert a vector to the list[float] Qdrant models expect (one C-level pass for arrays)."""
+    if isinstance(vector, np.ndarray):
+        return vector.tolist()
+    return vector
+
+
+def get_qdrant_client() -> AsyncQdrantClient:
+    """Get the next async Qdrant client from the pool, creating it on first use."""
+    global _qdrant_pool_cycle
+
+    if _qdrant_pool_cycle is None:
         try:
             if settings.qdrant_url:
                 # Server mode
-                logger.info(f"Connecting to Qdrant server at {settings.qdrant_url}")
-                _qdrant_client = QdrantClient(
-                    url=settings.qdrant_url,
-                    api_key=settings.qdrant_api_key,
-                    timeout=30,
+                logger.info(
+                    f"Connecting to Qdrant server at {settings.qdrant_url} "
+                    f"({POOL_SIZE} clients)"
                 )
+                _qdrant_pool[:] = [
+                    AsyncQdrantClient(
+                        url=settings.qdrant_url,
+                        api_key=settings.qdrant_api_key,
+                        timeout=30,
+                        # gRPC: protobuf vectors instead of JSON floats, one
+                        # multiplexed HTTP/2 connection
+                        prefer_grpc=settings.qdrant_prefer_grpc,
+                        grpc_port=settings.qdrant_grpc_port,
+                        grpc_options=GRPC_OPTIONS,
+                    )
+                    for _ in range(POOL_SIZE)
+                ]
             else:
                 # Local mode
                 logger.info(f"Initializing local Qdrant at {settings.qdrant_path}")
-                _qdrant_client = QdrantClient(path=settings.qdrant_path)
+                _qdrant_pool[:] = [AsyncQdrantClient(path=settings.qdrant_path)]
 
+            _qdrant_pool_cycle = itertools.cycle(_qdrant_pool)
             logger.info("Qdrant client initialized successfully")
 
         except Exception as e:
             logger.error(f"Failed to initialize Qdrant client: {e}")
             raise ConnectionError(f"Unable to connect to Qdrant: {e}")
 
-    return _qdrant_client
+    return next(_qdrant_pool_cycle)
+
+
+def get_collection_for_size(vector_size: int) -> str:
+    """
+    Get the collection name for a vector dimension.
+
+    Raises:
+        ValueError: If no collection holds vectors of this dimension
+    """
+    try:
+        return _COLLECTION_BY_SIZE[vector_size]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported embedding dimension {vector_size} "
+            f"(expected one of {sorted(_COLLECTION_BY_SIZE)})"
+        ) from None
 
 
-async def get_collection_config(vector_size: int = 1536) -> str:
+@lru_cache(maxsize=1024)
+def _bot_filter(bot_id: str) -> models.Filter:
     """
-    Get dynamic collection name based on vector size.
+    Filter matching one bot's points, built once per bot.
+
+    Shared between calls, so callers must not mutate it.
     """
-    if vector_size == 384:
-        return "myndulon_embeddings_local"
-    else:
-        return "myndulon_embeddings"
+    return models.Filter(
+        must=[
+            models.FieldCondition(
+                key="bot_id",
+                match=models.MatchValue(value=bot_id),
+            )
+        ]
+    )
+
+
+async def _ensure_payload_indexes(
+    client: AsyncQdrantClient,
+    collection_name: str,
+    existing: dict,
+) -> None:
+    """Create each PAYLOAD_INDEXES field index missing from `existing`."""
+    for field_name, field_schema in PAYLOAD_INDEXES.items():
+        if field_name in existing:
+            continue
+        await client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field_name,
+            field_schema=field_schema,
+        )
+        logger.info(f"Created payload index '{field_name}' on '{collection_name}'")
 
 
 async def init_collection() -> None:
@@ -67,37 +236,65 @@ async def init_collection() -> None:
     client = get_qdrant_client()
     
     # Define both collection types to ensure they exist
-    configs = [
-        ("myndulon_embeddings", 1536),      # OpenAI
-        ("myndulon_embeddings_local", 384), # Local
-    ]
+    configs = [(name, size) for size, name in _COLLECTION_BY_SIZE.items()]
 
     try:
-        collections = client.get_collections().collections
+        collections = (await client.get_collections()).collections
         existing_names = [col.name for col in collections]
+        _EXISTING_COLLECTIONS.update(existing_names)
 
         for name, size in configs:
             if name in existing_names:
                 logger.info(f"Collection '{name}' already exists")
+
+                # Local mode ignores quantization and payload indexes and
+                # never reports any, so there is nothing to backfill there
+                if not settings.qdrant_url:
+                    continue
+
+                # Enable quantization on collections created before it was added
+                info = await client.get_collection(name)
+                if info.config.quantization_config is None:
+                    await client.update_collection(
+                        collection_name=name,
+                        quantization_config=QUANTIZATION_CONFIG,
+                    )
+                    logger.info(f"Enabled int8 quantization on '{name}'")
+
+                # Add payload indexes introduced since the collection was created
+                await _ensure_payload_indexes(client, name, info.payload_schema)
+
+                # A threshold of 0 is a bulk-import pause left behind (e.g. a
+                # worker killed mid-import): turn indexing back on
+                threshold = info.config.optimizer_config.indexing_threshold
+                if threshold == 0:
+                    threshold = DEFAULT_INDEXING_THRESHOLD
+                    await client.update_collection(
+                        collection_name=name,
+                        optimizers_config=models.OptimizersConfigDiff(indexing_threshold=threshold),
+                    )
+                    logger.warning(f"Re-enabled indexing on '{name}' (threshold={threshold})")
+                _indexing_thresholds[name] = threshold or DEFAULT_INDEXING_THRESHOLD
                 continue
 
             # Create collection
             logger.info(f"Creating collection '{name}' (size={size})")
-            client.create_collection(
+            await client.create_collection(
                 collection_name=name,
                 vectors_config=models.VectorParams(
                     size=size,
                     distance=DISTANCE_METRIC,
                 ),
+                hnsw_config=HNSW_CONFIG,
+                quantization_config=QUANTIZATION_CONFIG,
+                **COLLECTION_OPTIONS[size],
             )
 
-            # Create payload index
-            client.create_payload_index(
-                collection_name=name,
-                field_name="bot_id",
-                field_schema=models.PayloadSchemaType.KEYWORD,
-            )
-            
+            # Create payload indexes (server only: local mode ignores them)
+            if settings.qdrant_url:
+                await _ensure_payload_indexes(client, name, {})
+
+            _EXISTING_COLLECTIONS.add(name)
             logger.info(f"Collection '{name}' created successfully")
 
     except Exception as e:
@@ -109,54 +306,191 @@ async def init_collection() -> None:
 
 
 async def health_check() -> dict:
-    """Check Qdrant health."""
+    """
+    Check Qdrant health (cached for HEALTH_CACHE_TTL seconds).
+
+    Liveness comes from the lightweight server info endpoint; the
+    collection count is refreshed at most every COLLECTION_COUNT_TTL
+    seconds rather than listing every collection on each probe.
+    """
+    global _health_cache, _collection_count
+
+    now = time.monotonic()
+    if _health_cache and now - _health_cache[0] < HEALTH_CACHE_TTL:
+        return _health_cache[1]
+
     try:
         client = get_qdrant_client()
-        collections = client.get_collections()
+        await client.info()
+
+        if _collection_count is None or now - _collection_count[0] >= COLLECTION_COUNT_TTL:
+            collections = await client.get_collections()
+            _collection_count = (now, len(collections.collections))
+
         mode = "server" if settings.qdrant_url else "local"
 
-        return {
+        result = {
             "healthy": True,
-            "collections": len(collections.collections),
+            "collections": _collection_count[1],
             "mode": mode,
         }
 
     except Exception as e:
         logger.error(f"Qdrant health check failed: {e}")
-        return {"healthy": False, "error": str(e)}
+        result = {"healthy": False, "error": str(e)}
+
+    _health_cache = (now, result)
+    return result
+
+
+@asynccontextmanager
+async def bulk_ingest_context(collection_name: str) -> AsyncIterator[None]:
+    """
+    Pause HNSW indexing on a collection for the duration of a bulk import.
+
+    Sets indexing_threshold=0 on enter so points are stored without
+    incremental graph updates, and restores the collection's configured
+    threshold on exit so the index is built once. Nested/concurrent imports
+    into the same collection share one pause. The restored value is never
+    read back from the server mid-import, where it may be another worker's
+    0. No-op in local mode (no optimizer).
+    """
+    if not settings.qdrant_url:
+        yield
+        return
+
+    client = get_qdrant_client()
+
+    # Count before awaiting so a concurrent import can't pause twice
+    _bulk_ingests[collection_name] = _bulk_ingests.get(collection_name, 0) + 1
+
+    try:
+        if _bulk_ingests[collection_name] == 1:
+            await client.update_collection(
+                collection_name=collection_name,
+                optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0),
+            )
+            logger.info(f"Paused indexing on '{collection_name}' for bulk ingest")
+
+        yield
+    finally:
+        _bulk_ingests[collection_name] -= 1
+        if _bulk_ingests[collection_name] == 0:
+            threshold = _indexing_thresholds.get(collection_name, DEFAULT_INDEXING_THRESHOLD)
+            await client.update_collection(
+                collection_name=collection_name,
+                optimizers_config=models.OptimizersConfigDiff(indexing_threshold=threshold),
+            )
+            logger.info(f"Resumed indexing on '{collection_name}' (threshold={threshold})")
+
+
+def _iter_points(
+    bot_id: str,
+    vectors: list[tuple[str, Vector, dict]],
+) -> Iterator[models.PointStruct]:
+    """
+    Yield PointStructs for `vectors`, tagging each payload with bot_id.
+
+    The payload dicts are tagged in place rather than copied; callers pass
+    dicts built for this upsert. Points are built with model_construct:
+    IDs, lists of floats and payloads are our own data, so per-point
+    pydantic validation is skipped.
+    """
+    for point_id, embedding, payload in vectors:
+        payload["bot_id"] = bot_id
+        yield models.PointStruct.model_construct(
+            id=point_id,
+            vector=_as_list(embedding),
+            payload=payload,
+        )
+
 
 async def upsert_vectors(
     bot_id: str,
-    vectors: list[tuple[str, list[float], dict]],
+    vectors: list[tuple[str, Vector, dict]],
 ) -> None:
     """Upsert vectors into the correct collection based on dimension."""
     if not vectors:
         return
 
     client = get_qdrant_client()
-    
-    # Determine collection based on first vector's dimension
-    vector_size = len(vectors[0][1])
-    collection_name = await get_collection_config(vector_size)
 
+    # Group by dimension, so a mixed batch sends each vector to its own
+    # collection instead of following the first vector's
+    by_size: defaultdict[int, list[tuple[str, Vector, dict]]] = defaultdict(list)
+    for vector in vectors:
+        by_size[len(vector[1])].append(vector)
+
+    # Resolve every collection before writing anything (unknown sizes raise)
+    targets = [
+        (get_collection_for_size(vector_size), vector_size, group)
+        for vector_size, group in by_size.items()
+    ]
+
+    await asyncio.gather(
+        *(
+            _upsert_collection(client, collection_name, vector_size, bot_id, group)
+            for collection_name, vector_size, group in targets
+        )
+    )
+
+
+async def _upsert_collection(
+    client: AsyncQdrantClient,
+    collection_name: str,
+    vector_size: int,
+    bot_id: str,
+    vectors: list[tuple[str, Vector, dict]],
+) -> None:
+    """Upsert same-dimension vectors into one collection."""
     try:
-        points = []
-        for point_id, embedding, payload in vectors:
-            full_payload = {"bot_id": bot_id, **payload}
-            points.append(
-                models.PointStruct(
-                    id=point_id,
-                    vector=embedding,
-                    payload=full_payload,
-                )
+        # Built lazily: large uploads stream points instead of holding them all
+        points = _iter_points(bot_id, vectors)
+
+        if len(vectors) > UPLOAD_THRESHOLD:
+            # Large ingestions: batched upload over UPLOAD_PARALLEL workers,
+            # returning once batches are received (indexing continues server-side)
+            upload = partial(
+                client.upload_points,
+                collection_name=collection_name,
+                points=points,
+                batch_size=UPLOAD_BATCH_SIZE,
+                parallel=UPLOAD_PARALLEL,
+                wait=False,
             )
+            if settings.qdrant_url:
+                # upload_points is synchronous even on the async client.
+                # Very large imports pause HNSW indexing until they finish
+                if len(vectors) > BULK_INGEST_THRESHOLD:
+                    # Wait until the points are applied: resuming indexing
+                    # while they're still queued would defeat the pause
+                    async with bulk_ingest_context(collection_name):
+                        await asyncio.to_thread(upload, wait=True)
+                else:
+                    await asyncio.to_thread(upload)
+            else:
+                upload()
+        else:
+            # Fixed-size batches, at most UPSERT_CONCURRENCY in flight
+            semaphore = asyncio.Semaphore(UPSERT_CONCURRENCY)
+            points = list(points)
+
+            async def upsert_batch(batch: list[models.PointStruct]) -> None:
+                async with semaphore:
+                    await client.upsert(
+                        collection_name=collection_name,
+                        points=batch,
+                        wait=False,
+                    )
 
-        client.upsert(
-            collection_name=collection_name,
-            points=points,
-        )
+            await asyncio.gather(
+                *(
+                    upsert_batch(points[i : i + UPSERT_BATCH_SIZE])
+                    for i in range(0, len(points), UPSERT_BATCH_SIZE)
+                )
+            )
 
-        logger.info(f"Upserted {len(points)} vectors to '{collection_name}' (size={vector_size}) for bot {bot_id}")
+        logger.info(f"Upserted {len(vectors)} vectors to '{collection_name}' (size={vector_size}) for bot {bot_id}")
 
     except Exception as e:
         logger.error(f"Failed to upsert vectors: {e}")
@@ -165,82 +499,135 @@ async def upsert_vectors(
 
 async def search_vectors(
     bot_id: str,
-    query_embedding: list[float],
+    query_embedding: Vector,
     limit: int = 5,
     similarity_threshold: float = 0.7,
 ) -> list[dict]:
     """Search for similar vectors in the correct collection."""
+    results = await search_vectors_batch(bot_id, [query_embedding], limit, similarity_threshold)
+    return results[0]
+
+
+async def search_vectors_batch(
+    bot_id: str,
+    query_embeddings: list[Vector],
+    limit: int = 5,
+    similarity_threshold: float = 0.7,
+) -> list[list[dict]]:
+    """
+    Run several searches for one bot in a single Qdrant request.
+
+    Args:
+        bot_id: Bot whose vectors to search
+        query_embeddings: Query vectors, all of the same dimension
+        limit: Maximum results per query
+        similarity_threshold: Minimum score per result
+
+    Returns:
+        One list of {"id", "score", "payload"} dicts per query, in order
+    """
+    if not query_embeddings:
+        return []
+
     client = get_qdrant_client()
-    
+
     # Determine collection based on query dimension
-    vector_size = len(query_embedding)
-    collection_name = await get_collection_config(vector_size)
+    vector_size = len(query_embeddings[0])
+    collection_name = get_collection_for_size(vector_size)
+
+    bot_filter = _bot_filter(bot_id)
+
+    # Local mode searches exactly (brute force) and warns on search params
+    search_params = SEARCH_PARAMS if settings.qdrant_url else None
 
     try:
-        results = client.query_points(
+        responses = await client.query_batch_points(
             collection_name=collection_name,
-            query=query_embedding,
-            query_filter=models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="bot_id",
-                        match=models.MatchValue(value=bot_id),
-                    )
-                ]
-            ),
-            limit=limit,
-            score_threshold=similarity_threshold,
+            requests=[
+                models.QueryRequest(
+                    query=_as_list(embedding),
+                    filter=bot_filter,
+                    limit=limit,
+                    score_threshold=similarity_threshold,
+                    params=search_params,
+                    with_payload=SEARCH_PAYLOAD,
+                    with_vector=False,
+                )
+                for embedding in query_embeddings
+            ],
         )
 
-        formatted_results = []
-        for point in results.points:
-            formatted_results.append(
+        return [
+            [
                 {
                     "id": point.id,
                     "score": point.score,
                     "payload": point.payload,
                 }
-            )
-
-        return formatted_results
+                for point in response.points
+            ]
+            for response in responses
+        ]
 
     except Exception as e:
         logger.error(f"Failed to search vectors: {e}")
         raise
 
 
+def _is_missing_collection(error: Exception) -> bool:
+    """Whether a Qdrant error means "collection not found" (REST or gRPC)."""
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code == 404
+
+    import grpc
+
+    return isinstance(error, grpc.RpcError) and error.code() == grpc.StatusCode.NOT_FOUND
+
+
 async def delete_vectors(bot_id: str) -> int:
     """Delete vectors for a bot from ALL collections to ensure cleanup."""
     client = get_qdrant_client()
     
     # Clean up from both collections just in case
-    collections = ["myndulon_embeddings", "myndulon_embeddings_local"]
-    total_deleted = 0
+    collections = list(_COLLECTION_BY_SIZE.values())
 
     try:
-        for name in collections:
-            # Check if exists first to avoid error
-            try:
-                client.get_collection(name)
-            except Exception:
-                continue
+        # Known from init_collection; fetched once if it hasn't run
+        if not _EXISTING_COLLECTIONS:
+            existing = (await client.get_collections()).collections
+            _EXISTING_COLLECTIONS.update(col.name for col in existing)
+
+        selector = models.FilterSelector(filter=_bot_filter(bot_id))
+
+        # Skip collections that don't exist to avoid errors
+        targets = [name for name in collections if name in _EXISTING_COLLECTIONS]
+
+        # Independent per-collection deletes: issue them concurrently.
+        # wait=False returns once the delete is queued; Qdrant applies
+        # operations in order, so a re-ingest right after can't be wiped by it
+        results = await asyncio.gather(
+            *(
+                client.delete(
+                    collection_name=name,
+                    points_selector=selector,
+                    wait=False,
+                )
+                for name in targets
+            ),
+            return_exceptions=True,
+        )
 
-            client.delete(
-                collection_name=name,
-                points_selector=models.FilterSelector(
-                    filter=models.Filter(
-                        must=[
-                            models.FieldCondition(
-                                key="bot_id",
-                                match=models.MatchValue(value=bot_id),
-                            )
-                        ]
-                    )
-                ),
-            )
-            total_deleted += 1
+        for name, result in zip(targets, results):
+            if not isinstance(result, Exception):
+                continue
+            if _is_missing_collection(result):
+                # Dropped since it was cached: nothing to clean up there
+                _EXISTING_COLLECTIONS.discard(name)
+                logger.info(f"Collection '{name}' no longer exists, skipped")
+            else:
+                logger.error(f"Failed to delete vectors for bot {bot_id} from '{name}': {result}")
 
-        return total_deleted
+        return sum(1 for result in results if not isinstance(result, Exception))
 
     except Exception as e:
         logger.error(f"Failed to delete vectors: {e}")
@@ -249,14 +636,17 @@ async def delete_vectors(bot_id: str) -> int:
 
 
 async def close_client() -> None:
-    """Close Qdrant client connection."""
-    global _qdrant_client
+    """Close all pooled Qdrant client connections."""
+    global _qdrant_pool_cycle
 
-    if _qdrant_client is not None:
+    for client in _qdrant_pool:
         try:
-            _qdrant_client.close()
-            logger.info("Qdrant client closed")
+            await client.close()
         except Exception as e:
             logger.error(f"Error closing Qdrant client: {e}")
-        finally:
-            _qdrant_client = None
+
+    if _qdrant_pool:
+        logger.info("Qdrant client closed")
+
+    _qdrant_pool.clear()
+    _qdrant_pool_cycle = None
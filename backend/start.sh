@@ -0,0 +1,20 @@
+#!/bin/sh
+# Production entrypoint for the Myndulon API.
+#
+# Runs uvicorn with the uvloop event loop and the httptools HTTP parser
+# (both C implementations, installed via uvicorn[standard]) and without the
+# auto-reloader.
+#
+# WEB_CONCURRENCY controls the number of worker processes. It defaults to 1
+# because embedded Qdrant (QDRANT_PATH) and the in-memory admin credentials
+# are per-process; raise it only when QDRANT_URL points at a Qdrant server.
+set -e
+
+exec uvicorn app.main:app \
+    --host "${HOST:-0.0.0.0}" \
+    --port "${PORT:-8080}" \
+    --workers "${WEB_CONCURRENCY:-1}" \
+    --loop uvloop \
+    --http httptools \
+    --limit-concurrency "${LIMIT_CONCURRENCY:-1000}" \
+    --timeout-keep-alive 30